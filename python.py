@@ -1,34 +1,270 @@
 import os
-import json
+import asyncio
+import hashlib
+import heapq
+import orjson
 import discord
 from discord.ext import commands
 from discord import app_commands
-from dataclasses import dataclass, asdict
+from dataclasses import dataclass, fields, replace
+from datetime import datetime, timezone
+from functools import lru_cache
 
 DATA_PATH = "ladder_data.json"
+SAVE_DELAY = 3.0  # secondes : regroupe les écritures disque rapprochées
+EDIT_DELAY = 1.5  # secondes : regroupe les éditions d'un même message ladder
+EMBED_CACHE_SIZE = 256  # embeds ladder gardés pour les éditions "compteur seul"
+EMBED_MAX_CHARS = 6000  # limite Discord sur la taille totale d'un embed
+
+@dataclass(slots=True)
+class PromotedEntry:
+    ladder_msg_id: int | None = None
+    author_id: int | None = None
+    author_name: str = "Inconnu"
+    author_avatar: str | None = None
+    content: str = ""
+    url: str = ""
+    timestamp: float = 0.0
+    count: int = 0
+    channel_id: int | None = None
+    image_url: str | None = None
+    # False : entrée enregistrée avant le cache complet (image jamais lue), à relire une fois.
+    # Persisté, sinon une sauvegarde (qui écrit image_url: null) effacerait le marqueur.
+    refreshed: bool = True
+
+    @classmethod
+    def from_dict(cls, raw: dict) -> "PromotedEntry":
+        entry = cls(**{k: v for k, v in raw.items() if k in _ENTRY_FIELDS})
+        if "image_url" not in raw:
+            entry.refreshed = False
+        return entry
+
+_ENTRY_FIELDS = frozenset(f.name for f in fields(PromotedEntry))
 
 @dataclass
 class LadderConfig:
     ladder_channel_id: int | None = None
     emoji: str = "💪"
     threshold: int = 3
-    promoted: dict | None = None  # { original_msg_id: {...infos...} }
+    promoted: dict | None = None  # { original_msg_id: PromotedEntry }
     admin_role_id: int | None = None  # <-- rôle requis pour les commandes protégées
+    commands_sig: str | None = None  # empreinte des slash commands déjà synchronisées
 
     def __post_init__(self):
         if self.promoted is None:
             self.promoted = {}
+        # Clés JSON (str) -> id de message (int), dicts -> PromotedEntry
+        self.promoted = {int(k): PromotedEntry.from_dict(v) for k, v in self.promoted.items()}
+        # Agrégats par auteur, maintenus au fil des écritures (cf. /ladder_top_joueur)
+        self._by_author: dict = {}
+        for key, data in self.promoted.items():
+            self._index(key, data)
+        # Compteurs à recaler sur Discord (réactions manquées pendant une déconnexion)
+        self._unverified: set[int] = set()
+        # Valeurs de champ /ladder_top déjà tronquées (non persistées)
+        self._field_values: dict[int, str] = {}
+        self._parse_emoji()
+        self._dirty = False
+        self._save_queue: asyncio.Queue | None = None
+        self._writer_task: asyncio.Task | None = None
+
+    # ---- Émoji ----
+
+    def _parse_emoji(self):
+        # "<:nom:id>" -> id (émoji custom) ; sinon le caractère unicode lui-même
+        parsed = discord.PartialEmoji.from_str(self.emoji)
+        self._emoji_id = parsed.id
+        self._emoji_name = parsed.name
+
+    def set_emoji(self, emoji: str):
+        self.emoji = emoji
+        self._parse_emoji()
+        # Les compteurs en cache sont ceux de l'ancien émoji : à relire
+        self.mark_unverified()
+        self.mark_dirty()
+
+    def matches_emoji(self, emoji: discord.PartialEmoji | discord.Emoji | str) -> bool:
+        """Comparaison sans str() : par id pour un émoji custom, par nom pour l'unicode."""
+        if isinstance(emoji, str):  # Reaction.emoji d'un émoji unicode
+            return self._emoji_id is None and emoji == self._emoji_name
+        if self._emoji_id is not None:
+            return emoji.id == self._emoji_id
+        return emoji.id is None and emoji.name == self._emoji_name
+
+    # ---- Index par auteur ----
+
+    @staticmethod
+    def _author_key(data: PromotedEntry):
+        author_id = data.author_id
+        if isinstance(author_id, int):
+            return author_id
+        if isinstance(author_id, str) and author_id.isdigit():
+            return int(author_id)
+        return f"name::{data.author_name}"
+
+    def _index(self, key: int, data: PromotedEntry):
+        count = int(data.count)
+        ts = float(data.timestamp)
+        entry = self._by_author.setdefault(self._author_key(data), {
+            "points": 0, "msgs": 0, "author_name": data.author_name,
+            "author_avatar": data.author_avatar, "first_ts": ts, "best_single": 0, "msg_ids": set()
+        })
+        entry["points"] += count
+        entry["msgs"] += 1
+        entry["msg_ids"].add(key)
+        entry["author_name"] = data.author_name
+        if data.author_avatar:
+            entry["author_avatar"] = data.author_avatar
+        entry["first_ts"] = min(entry["first_ts"], ts)
+        entry["best_single"] = max(entry["best_single"], count)
+
+    def _unindex(self, key: int, data: PromotedEntry):
+        akey = self._author_key(data)
+        entry = self._by_author[akey]
+        entry["points"] -= int(data.count)
+        entry["msgs"] -= 1
+        entry["msg_ids"].discard(key)
+        if not entry["msg_ids"]:
+            del self._by_author[akey]
+            return
+        # min/max ne se défont pas : on recalcule sur les seuls messages de l'auteur
+        others = [self.promoted[k] for k in entry["msg_ids"]]
+        entry["first_ts"] = min(float(d.timestamp) for d in others)
+        entry["best_single"] = max(int(d.count) for d in others)
+
+    def _reindex_count(self, key: int, data: PromotedEntry, count: int):
+        # Compteur seul : first_ts ne bouge pas, best_single ne se recalcule que s'il baisse
+        old = data.count
+        data.count = count
+        entry = self._by_author[self._author_key(data)]
+        entry["points"] += count - old
+        if count > entry["best_single"]:
+            entry["best_single"] = count
+        elif old == entry["best_single"] and count < old:
+            entry["best_single"] = max(int(self.promoted[k].count) for k in entry["msg_ids"])
+
+    def needs_refresh(self, key: int) -> bool:
+        return key in self._unverified or not self.promoted[key].refreshed
+
+    def mark_unverified(self):
+        """Le prochain événement de chaque entrée relira le vrai compteur sur Discord."""
+        self._unverified = set(self.promoted)
+
+    def set_promoted(self, key: int, data: PromotedEntry):
+        old = self.promoted.get(key)
+        if old is not None:
+            self._unindex(key, old)
+        self.promoted[key] = data
+        self._index(key, data)
+        self._unverified.discard(key)
+        self._field_values.pop(key, None)
+        self.mark_dirty()
+
+    def update_promoted(self, key: int, **changes):
+        data = self.promoted[key]
+        # Rien ne change (ex. pseudo/avatar identiques) : ni réindexation ni écriture
+        changes = {k: v for k, v in changes.items() if getattr(data, k) != v}
+        if not changes:
+            return
+        if changes.keys() == {"count"}:
+            self._reindex_count(key, data, changes["count"])
+            self.mark_dirty()
+            return
+        self._unindex(key, data)
+        for k, v in changes.items():
+            setattr(data, k, v)
+        self._index(key, data)
+        if "content" in changes or "url" in changes:
+            self._field_values.pop(key, None)
+        self.mark_dirty()
+
+    def field_value(self, key: int) -> str:
+        value = self._field_values.get(key)
+        if value is None:
+            data = self.promoted[key]
+            content = (data.content or "*—*").strip()
+            url = data.url
+            value = f"> {content[:200]}{'…' if len(content) > 200 else ''}\n[🔗 Lien vers le message]({url})"
+            self._field_values[key] = value
+        return value
+
+    def top_authors(self, limit: int) -> list:
+        return heapq.nlargest(
+            limit, self._by_author.items(),
+            key=lambda kv: (kv[1]["points"], kv[1]["best_single"], -kv[1]["first_ts"])
+        )
 
     @staticmethod
     def load():
         if os.path.exists(DATA_PATH):
-            with open(DATA_PATH, "r", encoding="utf-8") as f:
-                return LadderConfig(**json.load(f))
+            with open(DATA_PATH, "rb") as f:
+                return LadderConfig(**orjson.loads(f.read()))
         return LadderConfig()
 
+    def _to_dict(self) -> dict:
+        # Pas de dataclasses.asdict : il copie en profondeur tout `promoted`
+        # (orjson sérialise directement les PromotedEntry)
+        return {
+            "ladder_channel_id": self.ladder_channel_id,
+            "emoji": self.emoji,
+            "threshold": self.threshold,
+            "promoted": self.promoted,
+            "admin_role_id": self.admin_role_id,
+            "commands_sig": self.commands_sig,
+        }
+
+    def _dump(self) -> bytes:
+        return orjson.dumps(self._to_dict(), option=orjson.OPT_NON_STR_KEYS)
+
+    @staticmethod
+    def _write(data: bytes):
+        with open(DATA_PATH, "wb") as f:
+            f.write(data)
+
     def save(self):
-        with open(DATA_PATH, "w", encoding="utf-8") as f:
-            json.dump(asdict(self), f, ensure_ascii=False, indent=2)
+        """Écriture immédiate et bloquante (arrêt du bot)."""
+        self._dirty = False
+        self._write(self._dump())
+
+    def mark_dirty(self):
+        """Signale une modification ; l'écriture est faite plus tard par l'unique writer."""
+        if not self._dirty and self._save_queue is not None:
+            self._save_queue.put_nowait(None)
+        self._dirty = True
+
+    def start_writer(self):
+        if self._writer_task is not None:
+            return
+        self._save_queue = asyncio.Queue()
+        self._writer_task = asyncio.create_task(self._writer_loop())
+        if self._dirty:
+            self._save_queue.put_nowait(None)
+
+    async def _writer_loop(self):
+        while True:
+            await self._save_queue.get()
+            # Fenêtre de regroupement, puis on vide les signaux arrivés entre-temps
+            await asyncio.sleep(SAVE_DELAY)
+            while True:
+                try:
+                    self._save_queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    break
+            if not self._dirty:
+                continue
+            # Sérialisation sur la boucle (état cohérent), écriture dans un thread
+            self._dirty = False
+            try:
+                data = self._dump()
+                await asyncio.to_thread(self._write, data)
+            except Exception as e:
+                # Ne jamais laisser mourir l'unique writer : on journalise et on réessaie
+                print("Erreur sauvegarde :", e)
+                self.mark_dirty()
+
+    def flush(self):
+        if self._dirty:
+            self.save()
 
 config = LadderConfig.load()
 
@@ -36,8 +272,13 @@ config = LadderConfig.load()
 intents = discord.Intents.default()
 intents.message_content = True
 intents.reactions = True
-intents.members = True  # <-- pour lire les rôles des membres
-bot = commands.Bot(command_prefix="!", intents=intents)
+# Pas d'intent members : inter.user est déjà un Member (rôles inclus) dans une interaction
+bot = commands.Bot(
+    command_prefix="!",
+    intents=intents,
+    member_cache_flags=discord.MemberCacheFlags.none(),
+    chunk_guilds_at_startup=False,
+)
 tree = bot.tree
 
 # ---- Check utilitaire : rôle requis ----
@@ -66,73 +307,155 @@ async def on_app_command_error(interaction: discord.Interaction, error: app_comm
 
 # ========= UTILITAIRES =========
 
-async def count_reactions(message: discord.Message) -> int:
-    for reaction in message.reactions:
-        if str(reaction.emoji) == config.emoji:
-            return reaction.count
-    return 0
+def count_reactions(message: discord.Message) -> int:
+    return next((r.count for r in message.reactions if config.matches_emoji(r.emoji)), 0)
 
-def make_embed(msg: discord.Message, count: int) -> discord.Embed:
-    embed = discord.Embed(color=discord.Color.dark_grey())
-    embed.description = f"{msg.content or '*—*'}\n\n[Aller au message]({msg.jump_url})"
-    embed.set_author(name=msg.author.display_name, icon_url=msg.author.display_avatar.url)
-    embed.set_footer(text=msg.created_at.strftime("%d/%m/%Y %H:%M"))
+def entry_from_message(msg: discord.Message, count: int) -> PromotedEntry:
+    image_url = None
     if msg.attachments:
         att = msg.attachments[0]
         if att.content_type and att.content_type.startswith(("image/", "video/")):
-            embed.set_image(url=att.url)
-    embed.title = f"{config.emoji} **{count}** | {msg.channel.mention}"
+            image_url = att.url
+    return PromotedEntry(
+        author_id=msg.author.id,
+        author_name=msg.author.display_name,
+        author_avatar=msg.author.display_avatar.url,
+        content=msg.content,
+        url=msg.jump_url,
+        timestamp=msg.created_at.timestamp(),
+        count=count,
+        channel_id=msg.channel.id,
+        image_url=image_url
+    )
+
+@lru_cache(maxsize=4096)
+def format_minute(epoch_min: int) -> str:
+    return datetime.fromtimestamp(epoch_min * 60, timezone.utc).strftime("%d/%m/%Y %H:%M")
+
+def make_embed(data: PromotedEntry) -> discord.Embed:
+    embed = discord.Embed(color=discord.Color.dark_grey())
+    embed.description = f"{data.content or '*—*'}\n\n[Aller au message]({data.url})"
+    embed.set_author(name=data.author_name, icon_url=data.author_avatar)
+    embed.set_footer(text=format_minute(int(data.timestamp) // 60))
+    if data.image_url:
+        embed.set_image(url=data.image_url)
+    embed.title = embed_title(data)
     return embed
 
-async def post_or_update(msg: discord.Message, count: int):
-    ladder_ch = msg.guild.get_channel(config.ladder_channel_id)
+def embed_title(data: PromotedEntry) -> str:
+    return f"{config.emoji} **{data.count}** | <#{data.channel_id}>"
+
+async def post_or_update(guild: discord.Guild, key: int, data: PromotedEntry):
+    ladder_ch = guild.get_channel(config.ladder_channel_id)
     if ladder_ch is None:
         return
 
-    embed = make_embed(msg, count)
-    key = str(msg.id)
-
-    if key in config.promoted:
-        try:
-            ladder_msg_id = config.promoted[key]["ladder_msg_id"]
-            ladder_msg = await ladder_ch.fetch_message(ladder_msg_id)
-            await ladder_msg.edit(embed=embed)
-        except discord.NotFound:
-            sent = await ladder_ch.send(embed=embed)
-            config.promoted[key] = {
-                "ladder_msg_id": sent.id,
-                "author_id": msg.author.id,
-                "author_name": msg.author.display_name,
-                "author_avatar": msg.author.display_avatar.url,
-                "content": msg.content,
-                "url": msg.jump_url,
-                "timestamp": msg.created_at.timestamp(),
-                "count": count,
-                "channel_id": msg.channel.id
-            }
-            config.save()
-            return
+    ladder_msg_id = data.ladder_msg_id
+    if ladder_msg_id is not None:
+        schedule_edit(ladder_ch, key, ladder_msg_id)
+        return
 
-        config.promoted[key]["count"] = count
-        config.promoted[key]["author_id"] = msg.author.id
-        config.promoted[key]["author_name"] = msg.author.display_name
-        config.promoted[key]["author_avatar"] = msg.author.display_avatar.url
-        config.promoted[key]["content"] = msg.content
-        config.save()
+    sent = await ladder_ch.send(embed=make_embed(data))
+    config.set_promoted(key, replace(data, ladder_msg_id=sent.id))
+
+# Éditions en attente : { ladder_msg_id: task }
+_edit_tasks: dict[int, asyncio.Task] = {}
+# Dernier embed envoyé : { ladder_msg_id: embed } (seul le titre bouge entre deux éditions)
+_embed_cache: dict[int, discord.Embed] = {}
+
+def cached_embed(ladder_msg_id: int, data: PromotedEntry) -> discord.Embed:
+    embed = _embed_cache.get(ladder_msg_id)
+    if embed is None:
+        embed = make_embed(data)
+        if len(_embed_cache) >= EMBED_CACHE_SIZE:
+            del _embed_cache[next(iter(_embed_cache))]
+        _embed_cache[ladder_msg_id] = embed
     else:
+        embed.title = embed_title(data)
+    return embed
+
+def schedule_edit(ladder_ch: discord.TextChannel, key: int, ladder_msg_id: int):
+    """Une seule édition par fenêtre EDIT_DELAY, avec l'état le plus récent du cache."""
+    if ladder_msg_id in _edit_tasks:
+        return
+    _edit_tasks[ladder_msg_id] = asyncio.create_task(edit_later(ladder_ch, key, ladder_msg_id))
+
+async def edit_later(ladder_ch: discord.TextChannel, key: int, ladder_msg_id: int):
+    try:
+        await asyncio.sleep(EDIT_DELAY)
+    finally:
+        _edit_tasks.pop(ladder_msg_id, None)
+
+    data = config.promoted.get(key)
+    if data is None or data.ladder_msg_id != ladder_msg_id:
+        return
+    embed = cached_embed(ladder_msg_id, data)
+    try:
+        # PartialMessage : édition directe, sans GET préalable du message ladder
+        await ladder_ch.get_partial_message(ladder_msg_id).edit(embed=embed)
+        return
+    except discord.NotFound:
+        _embed_cache.pop(ladder_msg_id, None)
+    except discord.HTTPException as e:
+        print("Erreur édition ladder :", e)
+        return
+
+    # Message ladder supprimé : on le republie
+    try:
         sent = await ladder_ch.send(embed=embed)
-        config.promoted[key] = {
-            "ladder_msg_id": sent.id,
-            "author_id": msg.author.id,
-            "author_name": msg.author.display_name,
-            "author_avatar": msg.author.display_avatar.url,
-            "content": msg.content,
-            "url": msg.jump_url,
-            "timestamp": msg.created_at.timestamp(),
-            "count": count,
-            "channel_id": msg.channel.id
-        }
-        config.save()
+    except discord.HTTPException as e:
+        print("Erreur publication ladder :", e)
+        return
+    if key in config.promoted:
+        config.update_promoted(key, ladder_msg_id=sent.id)
+
+async def fetch_entry(
+    payload: discord.RawReactionActionEvent | discord.RawReactionClearEvent | discord.RawReactionClearEmojiEvent
+) -> PromotedEntry:
+    """Lit le message original (promotion ou entrée sans cache complet)."""
+    # PartialMessageable : aucun fetch_channel, un seul appel REST pour le message
+    channel = bot.get_partial_messageable(payload.channel_id, guild_id=payload.guild_id)
+    msg = await channel.get_partial_message(payload.message_id).fetch()
+    return entry_from_message(msg, count_reactions(msg))
+
+# Relectures en cours (une seule par message) et celles à refaire une fois terminées
+_refreshing: set[int] = set()
+_refresh_again: set[int] = set()
+
+def defer_to_refresh(key: int) -> bool:
+    """Un événement arrivé pendant une relecture la fait recommencer au lieu de toucher au cache."""
+    if key in _refreshing:
+        _refresh_again.add(key)
+        return True
+    return False
+
+async def refresh(
+    guild: discord.Guild,
+    payload: discord.RawReactionActionEvent | discord.RawReactionClearEvent | discord.RawReactionClearEmojiEvent
+):
+    """Relit l'original puis met à jour (ou crée) l'entrée et le message ladder."""
+    key = payload.message_id
+    _refreshing.add(key)
+    try:
+        while True:
+            _refresh_again.discard(key)
+            fresh = await fetch_entry(payload)
+            # Revérifié après l'await : l'entrée a pu être créée ou modifiée entre-temps
+            data = config.promoted.get(key)
+            if data is not None:
+                fresh.ladder_msg_id = data.ladder_msg_id
+                if fresh != data or config.needs_refresh(key):
+                    _embed_cache.pop(fresh.ladder_msg_id, None)
+                    config.set_promoted(key, fresh)
+                await post_or_update(guild, key, fresh)
+            elif fresh.count >= config.threshold:
+                await post_or_update(guild, key, fresh)
+            # Des événements sont arrivés pendant la lecture : le résultat peut les avoir ratés
+            if key not in _refresh_again:
+                return
+    finally:
+        _refreshing.discard(key)
+        _refresh_again.discard(key)
 
 # ========= ÉVÉNEMENTS =========
 
@@ -140,33 +463,73 @@ async def post_or_update(msg: discord.Message, count: int):
 async def on_raw_reaction_add(payload: discord.RawReactionActionEvent):
     if bot.user and payload.user_id == bot.user.id:
         return
-    if str(payload.emoji) != config.emoji:
+    if not config.matches_emoji(payload.emoji):
         return
 
     guild = bot.get_guild(payload.guild_id)
     if guild is None:
         return
-    channel = guild.get_channel(payload.channel_id) or await bot.fetch_channel(payload.channel_id)
-    msg = await channel.fetch_message(payload.message_id)
 
-    count = await count_reactions(msg)
-    if count >= config.threshold:
-        await post_or_update(msg, count)
+    key = payload.message_id
+    if defer_to_refresh(key):
+        return
+    data = config.promoted.get(key)
+    # Déjà promu (cache complet) : on suit le compteur sans relire l'original
+    if data is not None and not config.needs_refresh(key):
+        config.update_promoted(key, count=data.count + 1)
+        return await post_or_update(guild, key, data)
+
+    await refresh(guild, payload)
 
 @bot.event
 async def on_raw_reaction_remove(payload: discord.RawReactionActionEvent):
-    if str(payload.emoji) != config.emoji:
+    if bot.user and payload.user_id == bot.user.id:
+        return
+    if not config.matches_emoji(payload.emoji):
+        return
+
+    key = payload.message_id
+    if defer_to_refresh(key):
+        return
+    data = config.promoted.get(key)
+    if data is None:
         return
 
     guild = bot.get_guild(payload.guild_id)
     if guild is None:
         return
-    channel = guild.get_channel(payload.channel_id) or await bot.fetch_channel(payload.channel_id)
-    msg = await channel.fetch_message(payload.message_id)
 
-    if str(msg.id) in config.promoted:
-        count = await count_reactions(msg)
-        await post_or_update(msg, count)
+    if not config.needs_refresh(key):
+        config.update_promoted(key, count=max(0, data.count - 1))
+        return await post_or_update(guild, key, data)
+
+    await refresh(guild, payload)
+
+async def reset_count(payload: discord.RawReactionClearEvent | discord.RawReactionClearEmojiEvent):
+    key = payload.message_id
+    if defer_to_refresh(key):
+        return
+    data = config.promoted.get(key)
+    if data is None:
+        return
+
+    guild = bot.get_guild(payload.guild_id)
+    if guild is None:
+        return
+
+    if config.needs_refresh(key):
+        return await refresh(guild, payload)
+    config.update_promoted(key, count=0)
+    await post_or_update(guild, key, data)
+
+@bot.event
+async def on_raw_reaction_clear(payload: discord.RawReactionClearEvent):
+    await reset_count(payload)
+
+@bot.event
+async def on_raw_reaction_clear_emoji(payload: discord.RawReactionClearEmojiEvent):
+    if config.matches_emoji(payload.emoji):
+        await reset_count(payload)
 
 # ========= COMMANDES CONFIG =========
 
@@ -178,28 +541,28 @@ async def ladder_set_admin_role(interaction: discord.Interaction, role: discord.
         # On exige qu'un vrai admin serveur pose ce rôle la première fois
         return await interaction.response.send_message("⛔ Droit requis : Gérer le serveur", ephemeral=True)
     config.admin_role_id = role.id
-    config.save()
+    config.mark_dirty()
     await interaction.response.send_message(f"✅ Rôle admin ladder défini : {role.mention}", ephemeral=True)
 
 @tree.command(description="Configurer le salon ladder")
 @require_admin()
 async def ladder_set_channel(interaction: discord.Interaction, channel: discord.TextChannel):
     config.ladder_channel_id = channel.id
-    config.save()
+    config.mark_dirty()
     await interaction.response.send_message(f"✅ Salon ladder : {channel.mention}", ephemeral=True)
 
 @tree.command(description="Définir le seuil de réactions")
 @require_admin()
 async def ladder_set_threshold(interaction: discord.Interaction, value: int):
     config.threshold = max(1, int(value))
-    config.save()
+    config.mark_dirty()
     await interaction.response.send_message(f"✅ Seuil mis à {config.threshold}", ephemeral=True)
 
 @tree.command(description="Définir l’émoji utilisé pour le ladder")
 @require_admin()
 async def ladder_set_emoji(interaction: discord.Interaction, emoji: str):
-    config.emoji = emoji
-    config.save()
+    config.set_emoji(emoji)
+    _embed_cache.clear()
     await interaction.response.send_message(f"✅ Émoji mis à {emoji}", ephemeral=True)
 
 @tree.command(description="Voir la config du ladder")
@@ -216,67 +579,52 @@ async def ladder_status(interaction: discord.Interaction):
 
 # ========= COMMANDES LADDER =========
 
+def add_field_within_limit(embed: discord.Embed, name: str, value: str) -> bool:
+    # 25 champs max (borné par limit) mais aussi 6000 caractères au total : on s'arrête avant
+    if len(embed) + len(name) + len(value) > EMBED_MAX_CHARS:
+        return False
+    embed.add_field(name=name, value=value, inline=False)
+    return True
+
+def render_entry(rank: int, msg_id: int, data: PromotedEntry) -> tuple[str, str]:
+    # Rendu 100 % cache (pas d'await) : si un jour il faut relire les messages,
+    # passer par asyncio.gather + Semaphore plutôt qu'un await par entrée
+    field_name = f"#{rank} — {config.emoji} **{data.count}** — par **{data.author_name}**"
+    return field_name, config.field_value(msg_id)
+
 @tree.command(description="Affiche le ladder des messages promus (triés par réactions puis ancienneté)")
 @app_commands.describe(limit="Nombre maximum de messages à afficher (défaut: 10)")
-async def ladder_top(interaction: discord.Interaction, limit: int = 10):
+async def ladder_top(interaction: discord.Interaction, limit: app_commands.Range[int, 1, 25] = 10):
     if not config.promoted:
         return await interaction.response.send_message("Aucun message promu pour le moment.", ephemeral=True)
 
     entries = [
-        (msg_id, int(data.get("count", 0)), float(data.get("timestamp", 0.0)), data)
+        (msg_id, data.count, data.timestamp, data)
         for msg_id, data in config.promoted.items()
     ]
-    entries.sort(key=lambda x: (-x[1], x[2]))
-    entries = entries[:limit]
+    entries = heapq.nlargest(limit, entries, key=lambda x: (x[1], -x[2]))
 
     embed = discord.Embed(
         title=f"🏆 Top {limit} messages les plus {config.emoji}",
         color=discord.Color.gold()
     )
-    if entries and entries[0][3].get("author_avatar"):
-        embed.set_thumbnail(url=entries[0][3]["author_avatar"])
+    if entries and entries[0][3].author_avatar:
+        embed.set_thumbnail(url=entries[0][3].author_avatar)
 
-    for rank, (_, count, _, data) in enumerate(entries, start=1):
-        author = data.get("author_name", "Inconnu")
-        content = (data.get("content") or "*—*").strip()
-        url     = data.get("url", "")
-        field_name  = f"#{rank} — {config.emoji} **{count}** — par **{author}**"
-        field_value = f"> {content[:200]}{'…' if len(content) > 200 else ''}\n[🔗 Lien vers le message]({url})"
-        embed.add_field(name=field_name, value=field_value, inline=False)
+    for rank, (msg_id, _, _, data) in enumerate(entries, start=1):
+        field_name, field_value = render_entry(rank, msg_id, data)
+        if not add_field_within_limit(embed, field_name, field_value):
+            break
 
     await interaction.response.send_message(embed=embed)
 
 @tree.command(description="Classement des auteurs (1 point = 1 réaction sur ses messages promus)")
 @app_commands.describe(limit="Nombre maximum d'auteurs à afficher (défaut: 10)")
-async def ladder_top_joueur(interaction: discord.Interaction, limit: int = 10):
+async def ladder_top_joueur(interaction: discord.Interaction, limit: app_commands.Range[int, 1, 25] = 10):
     if not config.promoted:
         return await interaction.response.send_message("Aucun message promu pour le moment.", ephemeral=True)
 
-    by_author: dict = {}
-    for _msg_id, data in config.promoted.items():
-        count = int(data.get("count", 0))
-        author_id = data.get("author_id")
-        author_name = data.get("author_name", "Inconnu")
-        author_avatar = data.get("author_avatar", None)
-        ts = float(data.get("timestamp", 0.0))
-
-        key = author_id if isinstance(author_id, int) or (isinstance(author_id, str) and author_id.isdigit()) else f"name::{author_name}"
-        entry = by_author.setdefault(key, {
-            "points": 0, "msgs": 0, "author_name": author_name,
-            "author_avatar": author_avatar, "first_ts": ts, "best_single": 0
-        })
-        entry["points"] += count
-        entry["msgs"] += 1
-        entry["author_name"] = author_name
-        if author_avatar:
-            entry["author_avatar"] = author_avatar
-        entry["first_ts"] = min(entry["first_ts"], ts)
-        entry["best_single"] = max(entry["best_single"], count)
-
-    leaderboard = sorted(
-        by_author.items(),
-        key=lambda kv: (-kv[1]["points"], -kv[1]["best_single"], kv[1]["first_ts"])
-    )[:limit]
+    leaderboard = config.top_authors(limit)
 
     embed = discord.Embed(
         title=f"🏆 Top {limit} joueurs — ladder {config.emoji}",
@@ -293,22 +641,41 @@ async def ladder_top_joueur(interaction: discord.Interaction, limit: int = 10):
             mention = f" (<@{uid}>)"
         except Exception:
             pass
-        embed.add_field(
-            name=f"**#{rank}** — {name}{mention}",
-            value=f"**{pts}** points • {nmsg} message{'s' if nmsg > 1 else ''} • meilleur post: {info['best_single']} {config.emoji}",
-            inline=False
-        )
+        if not add_field_within_limit(
+            embed,
+            f"**#{rank}** — {name}{mention}",
+            f"**{pts}** points • {nmsg} message{'s' if nmsg > 1 else ''} • meilleur post: {info['best_single']} {config.emoji}"
+        ):
+            break
     await interaction.response.send_message(embed=embed)
 
 # ========= READY =========
 
+_synced = False
+
+def commands_signature() -> str:
+    payload = [c.to_dict(tree) for c in tree.get_commands()]
+    return hashlib.sha1(orjson.dumps(payload, option=orjson.OPT_SORT_KEYS)).hexdigest()
+
 @bot.event
 async def on_ready():
-    try:
-        await tree.sync()
-        print("Slash commands synchronisés ✅")
-    except Exception as e:
-        print("Erreur sync :", e)
+    global _synced
+    config.start_writer()
+    # Session neuve (démarrage ou reconnexion sans resume) : des réactions ont pu être manquées
+    config.mark_unverified()
+    # on_ready est rappelé à chaque reconnexion : une seule synchro par process,
+    # et seulement si les commandes ont changé depuis la dernière
+    if not _synced:
+        _synced = True
+        sig = commands_signature()
+        if sig != config.commands_sig:
+            try:
+                await tree.sync()
+                config.commands_sig = sig
+                config.mark_dirty()
+                print("Slash commands synchronisés ✅")
+            except Exception as e:
+                print("Erreur sync :", e)
     print(f"✅ Connecté en tant que {bot.user}")
 
 # ========= MAIN =========
@@ -317,4 +684,7 @@ if __name__ == "__main__":
     token = os.getenv("DISCORD_TOKEN")
     if not token:
         raise RuntimeError("DISCORD_TOKEN manquant dans l'environnement.")
-    bot.run(token)
\ No newline at end of file
+    try:
+        bot.run(token)
+    finally:
+        config.flush()
\ No newline at end of file